@@ -4,6 +4,7 @@ from playwright.async_api import async_playwright
 import requests
 from pymongo import MongoClient
 from datetime import datetime
+from logo_assets import store_logos
 
 # Constants
 API_URL = "https://main.prod.marketplacepartnerdirectory.azure.com/api/partners"
@@ -12,6 +13,7 @@ PAGE_SIZE = 18
 RETRY_DELAY = 30
 TIMEOUT = 60 * 1000
 MAX_RETRIES = 5
+DOWNLOAD_LOGOS = False  # Store logos as local content-addressed blobs after scraping
 
 # MongoDB setup
 MONGO_URI = "mongodb://localhost:27017"
@@ -121,6 +123,9 @@ class AzurePartnerScraper:
 
         print(f"Scraping completed. Total partners processed: {self.processed_count}")
 
+        if DOWNLOAD_LOGOS:
+            store_logos(self.collection)
+
 if __name__ == "__main__":
     scraper = AzurePartnerScraper()
     asyncio.run(scraper.run())
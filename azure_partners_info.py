@@ -80,7 +80,13 @@ def fetch_partners(page_offset, location, country_code):
     params = {
         "filter": f"products=Azure;sort=0;pageSize=18;onlyThisCountry=true;country={country_code};radius=100;locname={location};locationNotRequired=true;pageOffset={page_offset}"
     }
-    response = requests.get(BASE_URL, params=params)
+    try:
+        response = requests.get(BASE_URL, params=params)
+    except requests.exceptions.RequestException as e:
+        print(
+            f"Request error for {location} ({country_code}) with pageOffset {page_offset}: {e}"
+        )
+        return []
 
     if response.status_code == 200:
         return response.json().get("matchingPartners", {}).get("items", [])
@@ -92,57 +98,89 @@ def fetch_partners(page_offset, location, country_code):
         return []
 
 
-def process_and_store(partner, location, country_code):
+def build_partner_data(partner):
+    return {
+        "Name": partner.get("name", "Not available"),
+        "Description": partner.get("description", "Not available"),
+        "Linkedin": partner.get("linkedInOrganizationProfile", "Not available"),
+        "Industry_focus": partner.get("industryFocus", "Not available"),
+        "Logo": partner.get("logo", "Not available"),
+        "Product": partner.get("product", "Not available"),
+        "Service_type": partner.get("serviceType", "Not available"),
+        "Solutions": partner.get("solutions", "Not available"),
+        "Program_qualifications_Msp": partner.get(
+            "programQualificationsMsp", "Not available"
+        ),
+        "Program_qualifications_Asp": partner.get("programQualificationsAsp", "Not available"),
+        "Competencies": partner.get("competencies", "Not available"),
+        "Competencies_gold": partner.get("competenciesGold", "Not available"),
+        "Competencies_silver": partner.get("competenciesSilver", "Not available"),
+        "Solutions_partner_designations": partner.get("solutionsPartnerDesignations", "Not available"),
+        "Competency_summary": partner.get("competencySummary", "Not available"),
+    }
+
+
+def coalesce_partner(coalesced, partner, location):
+    # Later sightings overwrite the fields; locations accumulate in sweep order.
     company_id = partner.get("partnerId", "Not available")
+    entry = coalesced.get(company_id)
+
+    if entry:
+        entry["data"] = build_partner_data(partner)
+        if location not in entry["locations"]:
+            entry["locations"].append(location)
+    else:
+        coalesced[company_id] = {
+            "data": build_partner_data(partner),
+            "locations": [location],
+        }
+
+
+def process_and_store(company_id, data, locations):
     existing_entry = collection.find_one({"company_id": company_id})
 
     if existing_entry:
-        locations = existing_entry.get("Locations", [])
-        if location not in locations:
-            locations.append(location)
+        existing_locations = existing_entry.get("Locations", [])
+        merged_locations = existing_locations + [
+            location for location in locations if location not in existing_locations
+        ]
+
+        if merged_locations == existing_locations and all(
+            existing_entry.get(key) == value for key, value in data.items()
+        ):
+            print(f"No change for: {data['Name']}")
+            return
 
         collection.update_one(
             {"company_id": company_id},
-            {"$set": {"Locations": locations, "Last_modified": datetime.now()}},
+            {"$set": {**data, "Locations": merged_locations, "Last_modified": datetime.now()}},
         )
         print(
-            f"Updated: {partner.get('name', 'Unknown')} - Added new location: {location}"
+            f"Updated: {data['Name']} - Locations: {', '.join(merged_locations)}"
         )
     else:
-
         data = {
             "company_id": company_id,
-            "Name": partner.get("name", "Not available"),
-            "Description": partner.get("description", "Not available"),
-            "Linkedin": partner.get("linkedInOrganizationProfile", "Not available"),
-            "Industry_focus": partner.get("industryFocus", "Not available"),
-            "Logo": partner.get("logo", "Not available"),
-            "Product": partner.get("product", "Not available"),
-            "Service_type": partner.get("serviceType", "Not available"),
-            "Solutions": partner.get("solutions", "Not available"),
-            "Program_qualifications_Msp": partner.get(
-                "programQualificationsMsp", "Not available"
-            ),
-            "Program_qualifications_Asp": partner.get("programQualificationsAsp", "Not available"),
-            "Competencies": partner.get("competencies", "Not available"),
-            "Competencies_gold": partner.get("competenciesGold", "Not available"),
-            "Competencies_silver": partner.get("competenciesSilver", "Not available"),
-            "Solutions_partner_designations": partner.get("solutionsPartnerDesignations", "Not available"),
-            "Competency_summary": partner.get("competencySummary", "Not available"),
-            "Locations": [location],
+            **data,
+            "Locations": locations,
             "Last_modified": datetime.now(),
         }
 
         collection.insert_one(data)
-        print(f"Stored: {data['Name']} in {location} ({country_code})")
+        print(f"Stored: {data['Name']} in {', '.join(locations)}")
 
 
 def lambda_handler():
+    coalesced = {}
     for location, country_code in COUNTRY_CODES.items():
         for offset in range(0, 91, 18):
             partners = fetch_partners(offset, location, country_code)
             for partner in partners:
-                process_and_store(partner, location, country_code)
+                coalesce_partner(coalesced, partner, location)
+
+    print(f"Collected {len(coalesced)} unique partners. Writing to database...")
+    for company_id, entry in coalesced.items():
+        process_and_store(company_id, entry["data"], entry["locations"])
 
     print("Data extraction and storage completed.")
 
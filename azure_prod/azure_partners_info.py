@@ -81,7 +81,11 @@ def fetch_partners(page_offset, location, country_code):
     params = {
         "filter": f"products=Azure;sort=0;pageSize=18;onlyThisCountry=true;country={country_code};radius=100;locname={location};locationNotRequired=true;pageOffset={page_offset}"
     }
-    response = requests.get(BASE_URL, params=params)
+    try:
+        response = requests.get(BASE_URL, params=params)
+    except requests.exceptions.RequestException as e:
+        print(f"Request error for {location} ({country_code}) with pageOffset {page_offset}: {e}")
+        return []
     if response.status_code == 200:
         return response.json().get("matchingPartners", {}).get("items", [])
     else:
@@ -89,12 +93,8 @@ def fetch_partners(page_offset, location, country_code):
         return []
 
 
-def process_and_store(partner, location, country_code):
-    company_id = partner.get("partnerId", "Not available")
-    active_entry = collection.find_one({"company_id": company_id, "status": "active"})
-
-    new_data = {
-        "Company_id": company_id,
+def build_partner_data(partner):
+    return {
         "Name": partner.get("name", "Not available"),
         "Description": partner.get("description", "Not available"),
         "Linkedin": partner.get("linkedInOrganizationProfile", "Not available"),
@@ -110,34 +110,62 @@ def process_and_store(partner, location, country_code):
         "Competencies_silver": partner.get("competenciesSilver", "Not available"),
         "Solutions_partner_designations": partner.get("solutionsPartnerDesignations", "Not available"),
         "Competency_summary": partner.get("competencySummary", "Not available"),
-        "Locations": [location],
+    }
+
+
+def coalesce_partner(coalesced, partner, location):
+    # Keep the newest sighting so the version check compares against the latest fields.
+    company_id = partner.get("partnerId", "Not available")
+    entry = coalesced.get(company_id)
+
+    if entry:
+        entry["data"] = build_partner_data(partner)
+        if location not in entry["locations"]:
+            entry["locations"].append(location)
+    else:
+        coalesced[company_id] = {
+            "data": build_partner_data(partner),
+            "locations": [location],
+        }
+
+
+def process_and_store(company_id, data, locations):
+    active_entry = collection.find_one({"company_id": company_id, "status": "active"})
+
+    new_data = {
+        "company_id": company_id,
+        **data,
+        "Locations": locations,
         "Last_modified": datetime.now(),
     }
 
     if active_entry:
         updated = False
         previous_data = copy.deepcopy(active_entry)
-        new_data["locations"] = list(set(active_entry.get("locations", []) + [location]))
+        existing_locations = active_entry.get("Locations", [])
+        new_data["Locations"] = existing_locations + [
+            location for location in locations if location not in existing_locations
+        ]
 
         for key in new_data:
-            if key in ["_id", "last_modified", "status", "counter"]:
+            if key in ["_id", "Locations", "Last_modified", "status", "counter"]:
                 continue
             if new_data[key] != active_entry.get(key):
                 updated = True
                 break
 
         # If only location is new, update the same document
-        if not updated and new_data["locations"] != active_entry.get("locations", []):
+        if not updated and new_data["Locations"] != existing_locations:
             collection.update_one(
                 {"_id": active_entry["_id"]},
                 {
                     "$set": {
-                        "locations": new_data["locations"],
-                        "last_modified": datetime.now()
+                        "Locations": new_data["Locations"],
+                        "Last_modified": datetime.now()
                     }
                 }
             )
-            print(f"Location updated for: {new_data['name']}")
+            print(f"Location updated for: {new_data['Name']}")
             return
 
         if updated:
@@ -150,23 +178,29 @@ def process_and_store(partner, location, country_code):
             new_data["counter"] = active_entry.get("counter", 1) + 1
             new_data["status"] = "active"
             collection.insert_one(new_data)
-            print(f"Updated: {new_data['name']} - Version {new_data['counter']}")
+            print(f"Updated: {new_data['Name']} - Version {new_data['counter']}")
         else:
-            print(f"No change for: {new_data['name']}")
+            print(f"No change for: {new_data['Name']}")
 
     else:
         # First insert
         new_data["counter"] = 1
-        collection.insert_one(new_data)  # no status field
-        print(f"Stored: {new_data['name']} in {location} ({country_code})")
+        new_data["status"] = "active"
+        collection.insert_one(new_data)
+        print(f"Stored: {new_data['Name']} in {', '.join(locations)}")
 
 
 def lambda_handler():
+    coalesced = {}
     for location, country_code in COUNTRY_CODES.items():
         for offset in range(0, 91, 18):
             partners = fetch_partners(offset, location, country_code)
             for partner in partners:
-                process_and_store(partner, location, country_code)
+                coalesce_partner(coalesced, partner, location)
+
+    print(f"Collected {len(coalesced)} unique partners. Writing to database...")
+    for company_id, entry in coalesced.items():
+        process_and_store(company_id, entry["data"], entry["locations"])
     print("Data extraction and storage completed.")
 
 
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from pymongo import MongoClient
+
+# Constants
+BLOB_DIR = "logo_blobs"
+MANIFEST_FILE = os.path.join(BLOB_DIR, "manifest.json")
+MAX_WORKERS = 8
+TIMEOUT = 30
+
+# MongoDB setup
+MONGO_URI = "mongodb://localhost:27017"
+DB_NAME = "Azure_partners_db"
+COLLECTION_NAME = "Azure_db"
+
+
+def blob_path(content_hash):
+    """Path of a blob inside the content-addressed directory"""
+    return os.path.join(BLOB_DIR, content_hash[:2], content_hash)
+
+
+def load_manifest():
+    """Load the url -> {hash, etag, last_modified} manifest from disk"""
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+
+    try:
+        with open(MANIFEST_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading logo manifest: {e}")
+        return {}
+
+
+def save_manifest(manifest):
+    """Write the manifest atomically so an interrupted run can't corrupt it"""
+    os.makedirs(BLOB_DIR, exist_ok=True)
+    temp_file = MANIFEST_FILE + ".tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(temp_file, MANIFEST_FILE)
+
+
+def write_blob(content):
+    """Store content under its sha256 and return the hash"""
+    content_hash = hashlib.sha256(content).hexdigest()
+    path = blob_path(content_hash)
+
+    # Many partners share the same CDN image, so identical content is only written once
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{id(content)}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    return content_hash
+
+
+def fetch_logo(session, url, cached):
+    """Download a logo, skipping it when the server reports it unchanged"""
+    headers = {}
+    if cached and os.path.exists(blob_path(cached["hash"])):
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = session.get(url, headers=headers, timeout=TIMEOUT)
+    if response.status_code == 304:
+        return cached
+    if response.status_code != 200:
+        print(f"Error fetching logo {url}: {response.status_code}")
+        return None
+
+    return {
+        "hash": write_blob(response.content),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+def download_logos(urls, manifest, max_workers=MAX_WORKERS):
+    """Download logos concurrently with a bounded pool and return url -> hash"""
+    hashes = {}
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_logo, session, url, manifest.get(url)): url
+            for url in urls
+        }
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                entry = future.result()
+            except requests.exceptions.RequestException as e:
+                print(f"Request error for logo {url}: {e}")
+                continue
+            except OSError as e:
+                print(f"Error storing logo {url}: {e}")
+                continue
+            if entry:
+                manifest[url] = entry
+                hashes[url] = entry["hash"]
+    return hashes
+
+
+def store_logos(collection, logo_field="logo", hash_field="logo_hash", max_workers=MAX_WORKERS):
+    """Download every partner logo in the collection and record its blob hash"""
+    partners = list(collection.find(
+        {logo_field: {"$regex": "^https?://"}},
+        {"company_id": 1, logo_field: 1, hash_field: 1},
+    ))
+    # Each distinct URL is fetched once, however many partners point at it
+    urls = {partner[logo_field] for partner in partners}
+    print(f"Fetching {len(urls)} unique logos for {len(partners)} partners...")
+
+    manifest = load_manifest()
+    try:
+        hashes = download_logos(urls, manifest, max_workers)
+    finally:
+        # Keep the validators of whatever was downloaded, even if the run fails part-way
+        try:
+            save_manifest(manifest)
+        except OSError as e:
+            print(f"Error writing logo manifest: {e}")
+
+    updated_count = 0
+    for partner in partners:
+        # A failed download falls back to the last blob stored for the same URL
+        cached = manifest.get(partner[logo_field])
+        content_hash = hashes.get(partner[logo_field]) or (cached and cached["hash"])
+        if content_hash:
+            if content_hash != partner.get(hash_field):
+                collection.update_one(
+                    {"_id": partner["_id"]},
+                    {"$set": {hash_field: content_hash}},
+                )
+                updated_count += 1
+        elif hash_field in partner:
+            # The logo URL changed and its new image couldn't be stored, so the old hash no longer applies
+            collection.update_one(
+                {"_id": partner["_id"]},
+                {"$unset": {hash_field: ""}},
+            )
+            updated_count += 1
+
+    print(f"Logo assets stored. {len(set(hashes.values()))} blobs, {updated_count} partners updated")
+    return hashes
+
+
+if __name__ == "__main__":
+    client = MongoClient(MONGO_URI)
+    store_logos(client[DB_NAME][COLLECTION_NAME])
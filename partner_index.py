@@ -0,0 +1,235 @@
+from datetime import datetime
+from pymongo import MongoClient
+
+# MongoDB setup
+MONGO_URI = "mongodb://localhost:27017"
+DB_NAME = "Azure_partners_db"
+COLLECTION_NAME = "Azure_db"
+
+FACETS = ["industry_focus", "products", "services", "target_company_sizes", "locations"]
+
+# Facet -> document field for each scraper's collection, plus the field holding its modification time
+SOURCES = {
+    "azure": {
+        "timestamp": "last_updated",
+        "fields": {
+            "industry_focus": "industry_focus",
+            "products": "products",
+            "services": "services",
+            "target_company_sizes": "target_company_sizes",
+        },
+    },
+    "azure_partners_info": {
+        "timestamp": "Last_modified",
+        "fields": {
+            "industry_focus": "Industry_focus",
+            "products": "Product",
+            "services": "Service_type",
+            "locations": "Locations",
+        },
+    },
+}
+
+
+IGNORED_VALUES = frozenset(["", "Not available"])
+
+
+def facet_values(value):
+    """Normalize a stored field into a set of facet values"""
+    if isinstance(value, str):
+        values = frozenset([value])
+    elif isinstance(value, list):
+        try:
+            values = frozenset(value)
+        except TypeError:
+            # Lists holding dicts or other unhashable items keep only their strings
+            values = frozenset(item for item in value if isinstance(item, str))
+    else:
+        return frozenset()
+
+    return values - IGNORED_VALUES
+
+
+def bit_ids(bitmap):
+    """Yield the integer IDs set in a bitmap"""
+    # Scan the binary string once, lowest bit first; clearing bits on the int would copy it every step
+    bits = bin(bitmap)[:1:-1]
+    doc_id = bits.find("1")
+    while doc_id != -1:
+        yield doc_id
+        doc_id = bits.find("1", doc_id + 1)
+
+
+def ids_bitmap(doc_ids):
+    """Build a bitmap from a list of integer IDs in one pass"""
+    bits = bytearray(max(doc_ids) // 8 + 1)
+    for doc_id in doc_ids:
+        bits[doc_id >> 3] |= 1 << (doc_id & 7)
+    return int.from_bytes(bits, "little")
+
+
+class PartnerIndex:
+    def __init__(self, collections):
+        """collections maps a SOURCES name to the collection that scraper writes"""
+        self.collections = collections
+        self.watermarks = {source: None for source in collections}
+        self.ids = {}
+        self.company_ids = []
+        self.doc_values = {}
+        # Posting lists are Python ints used as bitmaps over partner IDs
+        self.postings = {facet: {} for facet in FACETS}
+        self._facet_counts = None
+
+    def partner_id(self, company_id):
+        """Map a company ID to a dense integer ID"""
+        doc_id = self.ids.get(company_id)
+        if doc_id is None:
+            doc_id = len(self.company_ids)
+            self.ids[company_id] = doc_id
+            self.company_ids.append(company_id)
+        return doc_id
+
+    def merged_values(self, doc_id):
+        """Facet values of a partner across every source it was scraped from"""
+        merged = {}
+        for source in SOURCES:
+            for facet, values in self.doc_values.get((doc_id, source), {}).items():
+                merged[facet] = merged[facet] | values if facet in merged else values
+        return merged
+
+    def index_document(self, source, document):
+        """Index one document, replacing what the same source indexed before"""
+        self.index_documents(source, [document])
+
+    def index_documents(self, source, documents):
+        """Index a batch of documents; a later document for the same partner replaces an earlier one"""
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source: {source}")
+
+        old_values = {}
+        for document in documents:
+            company_id = document.get("company_id")
+            if not company_id or company_id == "Not available":
+                continue
+
+            doc_id = self.partner_id(company_id)
+            if doc_id not in old_values:
+                old_values[doc_id] = self.merged_values(doc_id)
+            values = {}
+            for facet, field in SOURCES[source]["fields"].items():
+                facet_set = facet_values(document.get(field))
+                if facet_set:
+                    values[facet] = facet_set
+            self.doc_values[(doc_id, source)] = values
+        if not old_values:
+            return
+
+        # Collect the changed IDs per value first so each posting is rebuilt once per batch
+        added = {facet: {} for facet in FACETS}
+        removed = {facet: {} for facet in FACETS}
+        for doc_id, old in old_values.items():
+            new = self.merged_values(doc_id)
+            for facet in old.keys() | new.keys():
+                old_set = old.get(facet, frozenset())
+                new_set = new.get(facet, frozenset())
+                for value in old_set - new_set:
+                    removed[facet].setdefault(value, []).append(doc_id)
+                for value in new_set - old_set:
+                    added[facet].setdefault(value, []).append(doc_id)
+
+        self._facet_counts = None
+        for facet in FACETS:
+            postings = self.postings[facet]
+            for value, doc_ids in removed[facet].items():
+                postings[value] &= ~ids_bitmap(doc_ids)
+                if not postings[value]:
+                    del postings[value]
+            for value, doc_ids in added[facet].items():
+                postings[value] = postings.get(value, 0) | ids_bitmap(doc_ids)
+
+    def refresh(self):
+        """Pull only the records modified since the last refresh of each source"""
+        indexed_count = 0
+        for source, collection in self.collections.items():
+            timestamp_field = SOURCES[source]["timestamp"]
+            projection = ["company_id", timestamp_field] + list(SOURCES[source]["fields"].values())
+            query = {}
+            if self.watermarks[source] is not None:
+                # $gte keeps records written in the same instant as the watermark; reindexing is idempotent
+                query[timestamp_field] = {"$gte": self.watermarks[source]}
+
+            # Oldest first, so when a collection keeps old versions of a partner the newest one wins
+            documents = list(collection.find(query, projection).sort(timestamp_field, 1))
+            self.index_documents(source, documents)
+
+            for document in documents:
+                modified = document.get(timestamp_field)
+                if isinstance(modified, datetime) and (
+                    self.watermarks[source] is None or modified > self.watermarks[source]
+                ):
+                    self.watermarks[source] = modified
+            indexed_count += len(documents)
+
+        print(f"Index refreshed. {indexed_count} records indexed, {len(self.company_ids)} partners total")
+        return indexed_count
+
+    def match(self, filters):
+        """Bitmap of partners matching every facet (AND) and any listed value within a facet (OR)"""
+        result = (1 << len(self.company_ids)) - 1
+        for facet, values in filters.items():
+            if facet not in self.postings:
+                raise ValueError(f"Unknown facet: {facet}")
+            if isinstance(values, str):
+                values = [values]
+
+            facet_bitmap = 0
+            for value in values:
+                facet_bitmap |= self.postings[facet].get(value, 0)
+            result &= facet_bitmap
+            if not result:
+                break
+        return result
+
+    def facet_counts(self, bitmap=None):
+        """Count partners per facet value, over everything or within a result bitmap"""
+        if bitmap is None:
+            if self._facet_counts is None:
+                self._facet_counts = {
+                    facet: {value: posting.bit_count() for value, posting in postings.items()}
+                    for facet, postings in self.postings.items()
+                }
+            # Copy so callers can't change the cached counts
+            return {facet: dict(counts) for facet, counts in self._facet_counts.items()}
+
+        counts = {}
+        for facet, postings in self.postings.items():
+            counts[facet] = {}
+            for value, posting in postings.items():
+                count = (posting & bitmap).bit_count()
+                if count:
+                    counts[facet][value] = count
+        return counts
+
+    def query(self, filters, limit=None):
+        """Answer a faceted query with matching company IDs and facet counts"""
+        bitmap = self.match(filters)
+        company_ids = []
+        for doc_id in bit_ids(bitmap):
+            if limit is not None and len(company_ids) >= limit:
+                break
+            company_ids.append(self.company_ids[doc_id])
+
+        return {
+            "total": bitmap.bit_count(),
+            "company_ids": company_ids,
+            "facet_counts": self.facet_counts(bitmap),
+        }
+
+
+if __name__ == "__main__":
+    client = MongoClient(MONGO_URI)
+    index = PartnerIndex({"azure": client[DB_NAME][COLLECTION_NAME]})
+    index.refresh()
+    for facet, counts in index.facet_counts().items():
+        top_values = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:5]
+        print(f"{facet}: {top_values}")